@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -122,6 +122,22 @@ class BaseAgent(BaseModel, ABC):
         Returns:
             A string summarizing the execution results.
 
+        Raises:
+            RuntimeError: If the agent is not in IDLE state at start.
+        """
+        results: List[str] = [result async for result in self.run_stream(request)]
+        return "\n".join(results) if results else "No steps executed"
+
+    async def run_stream(self, request: Optional[str] = None) -> AsyncIterator[str]:
+        """Execute the agent's main loop, yielding each step result as it completes.
+
+        Args:
+            request: Optional initial user request to process.
+
+        Yields:
+            One summary line per executed step, plus a termination notice if
+            the step limit is reached.
+
         Raises:
             RuntimeError: If the agent is not in IDLE state at start.
         """
@@ -131,27 +147,29 @@ class BaseAgent(BaseModel, ABC):
         if request:
             self.update_memory("user", request)
 
-        results: List[str] = []
-        async with self.state_context(AgentState.RUNNING):
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
-            ):
-                self.current_step += 1
-                logger.info(f"Executing step {self.current_step}/{self.max_steps}")
-                step_result = await self.step()
-
-                # Check for stuck state
-                if self.is_stuck():
-                    self.handle_stuck_state()
-
-                results.append(f"Step {self.current_step}: {step_result}")
-
-            if self.current_step >= self.max_steps:
-                self.current_step = 0
-                self.state = AgentState.IDLE
-                results.append(f"Terminated: Reached max steps ({self.max_steps})")
-        await SANDBOX_CLIENT.cleanup()
-        return "\n".join(results) if results else "No steps executed"
+        try:
+            async with self.state_context(AgentState.RUNNING):
+                while (
+                    self.current_step < self.max_steps
+                    and self.state != AgentState.FINISHED
+                ):
+                    self.current_step += 1
+                    logger.info(f"Executing step {self.current_step}/{self.max_steps}")
+                    step_result = await self.step()
+
+                    # Check for stuck state
+                    if self.is_stuck():
+                        self.handle_stuck_state()
+
+                    yield f"Step {self.current_step}: {step_result}"
+
+                if self.current_step >= self.max_steps:
+                    self.current_step = 0
+                    self.state = AgentState.IDLE
+                    yield f"Terminated: Reached max steps ({self.max_steps})"
+        finally:
+            # Also runs when the consumer cancels or abandons the stream
+            await SANDBOX_CLIENT.cleanup()
 
     @abstractmethod
     async def step(self) -> str:
@@ -1,6 +1,6 @@
 import asyncio
 import json
-from typing import Any, List, Optional, Union
+from typing import Any, AsyncIterator, List, Optional, Union
 
 from pydantic import Field
 
@@ -242,9 +242,14 @@ class ToolCallAgent(ReActAgent):
                     )
         logger.info(f"✨ Cleanup complete for agent '{self.name}'.")
 
-    async def run(self, request: Optional[str] = None) -> str:
-        """Run the agent with cleanup when done."""
+    async def run_stream(self, request: Optional[str] = None) -> AsyncIterator[str]:
+        """Run the agent step by step with cleanup when done."""
+        stream = super().run_stream(request)
         try:
-            return await super().run(request)
+            async for step_result in stream:
+                yield step_result
         finally:
+            # Close the base loop explicitly so an early aclose() also restores
+            # its state and sandbox instead of leaving it suspended until GC
+            await stream.aclose()
             await self.cleanup()
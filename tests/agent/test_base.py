@@ -0,0 +1,145 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.agent.base import BaseAgent
+from app.agent.toolcall import ToolCallAgent
+from app.llm import LLM
+from app.schema import AgentState
+
+
+class StubSandboxClient:
+    """Counts cleanup calls in place of the Docker-backed sandbox client."""
+
+    def __init__(self):
+        self.cleanups = 0
+
+    async def cleanup(self) -> None:
+        self.cleanups += 1
+
+
+class StubStepsMixin:
+    """Finishes after `finish_after` steps; blocks forever from `block_at` on."""
+
+    async def step(self) -> str:
+        if self.block_at and self.current_step >= self.block_at:
+            await asyncio.Event().wait()
+        if self.current_step >= self.finish_after:
+            self.state = AgentState.FINISHED
+        return f"done {self.current_step}"
+
+
+class StubAgent(StubStepsMixin, BaseAgent):
+    name: str = "stub"
+    finish_after: int = 3
+    block_at: int = 0
+
+
+class StubToolCallAgent(StubStepsMixin, ToolCallAgent):
+    name: str = "stub_toolcall"
+    finish_after: int = 3
+    block_at: int = 0
+    cleanups: int = 0
+
+    async def cleanup(self):
+        self.cleanups += 1
+        await super().cleanup()
+
+
+def make_agent(cls, **kwargs):
+    # Bypass LLM.__init__, which needs an API config and a tokenizer download
+    return cls(llm=object.__new__(LLM), **kwargs)
+
+
+@pytest.fixture
+def sandbox_client(monkeypatch) -> StubSandboxClient:
+    """Replaces the shared sandbox client used by the agent loop."""
+    client = StubSandboxClient()
+    monkeypatch.setattr("app.agent.base.SANDBOX_CLIENT", client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_run_joins_run_stream_results(sandbox_client: StubSandboxClient):
+    """Tests that run() returns the joined results of run_stream()."""
+    streamed: List[str] = [
+        result async for result in make_agent(StubAgent).run_stream("go")
+    ]
+    result = await make_agent(StubAgent).run("go")
+
+    assert streamed == ["Step 1: done 1", "Step 2: done 2", "Step 3: done 3"]
+    assert result == "\n".join(streamed)
+    assert sandbox_client.cleanups == 2
+
+
+@pytest.mark.asyncio
+async def test_run_reports_max_steps(sandbox_client: StubSandboxClient):
+    """Tests that reaching max_steps is reported and resets the agent."""
+    agent = make_agent(StubAgent, max_steps=2)
+
+    result = await agent.run("go")
+
+    assert result.splitlines()[-1] == "Terminated: Reached max steps (2)"
+    assert agent.state == AgentState.IDLE
+    assert agent.current_step == 0
+
+
+class EmptyStreamAgent(StubAgent):
+    async def run_stream(self, request=None):
+        return
+        yield
+
+
+@pytest.mark.asyncio
+async def test_run_without_steps():
+    """Tests the summary when run_stream() yields nothing."""
+    agent = make_agent(EmptyStreamAgent)
+
+    assert await agent.run("go") == "No steps executed"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("agent_cls", [StubAgent, StubToolCallAgent])
+async def test_aclose_mid_stream_cleans_up(
+    sandbox_client: StubSandboxClient, agent_cls
+):
+    """Tests that closing the stream early restores state and cleans up."""
+    agent = make_agent(agent_cls)
+    stream = agent.run_stream("go")
+
+    assert await stream.__anext__() == "Step 1: done 1"
+    assert agent.state == AgentState.RUNNING
+    await stream.aclose()
+
+    assert agent.state == AgentState.IDLE
+    assert sandbox_client.cleanups == 1
+    if agent_cls is StubToolCallAgent:
+        assert agent.cleanups == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("agent_cls", [StubAgent, StubToolCallAgent])
+async def test_cancel_mid_stream_cleans_up(
+    sandbox_client: StubSandboxClient, agent_cls
+):
+    """Tests that cancelling a run blocked in a step restores state and cleans up."""
+    agent = make_agent(agent_cls, block_at=2)
+    streamed: List[str] = []
+
+    async def consume():
+        async for result in agent.run_stream("go"):
+            streamed.append(result)
+
+    task = asyncio.create_task(consume())
+    while agent.current_step < 2:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert streamed == ["Step 1: done 1"]
+    assert agent.state == AgentState.IDLE
+    assert sandbox_client.cleanups == 1
+    if agent_cls is StubToolCallAgent:
+        assert agent.cleanups == 1
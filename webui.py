@@ -5,7 +5,12 @@ A Gradio-based web interface for OpenManus agent system
 
 import asyncio
 import argparse
-from typing import List, Tuple
+import functools
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 import gradio as gr
 
 from app.agent.manus import Manus
@@ -61,7 +66,6 @@ OpenManusは、複数のツールを使用してさまざまなタスクを解
         "completed": "✅ タスク完了！\n\n{result}",
         "completed_simple": "✅ タスクが正常に完了しました！",
         "error": "❌ エラー: {error}",
-        "already_processing": "⚠️ 既にリクエストを処理中です。お待ちください...",
         "language_label": "言語 / Language"
     },
     "en": {
@@ -110,77 +114,158 @@ Please be patient and avoid sending multiple requests simultaneously.
         "completed": "✅ Task completed!\n\n{result}",
         "completed_simple": "✅ Task completed successfully!",
         "error": "❌ Error: {error}",
-        "already_processing": "⚠️ Already processing a request. Please wait...",
         "language_label": "Language / 言語"
     }
 }
 
 
+def _freeze(value):
+    """Intern placeholder-free strings and turn nested lists into tuples"""
+    if isinstance(value, str):
+        return value if "{" in value else sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Shared, immutable translation values keep long-running servers lean
+TRANSLATIONS = {
+    lang: {key: _freeze(value) for key, value in texts.items()}
+    for lang, texts in TRANSLATIONS.items()
+}
+
+# Translations without format placeholders, resolved once at import
+RENDERED_STATIC = {
+    lang: {k: v for k, v in texts.items() if not isinstance(v, str) or "{" not in v}
+    for lang, texts in TRANSLATIONS.items()
+}
+for _texts in RENDERED_STATIC.values():
+    _texts["header_md"] = sys.intern(f"# {_texts['title']}\n\n{_texts['description']}")
+
+# Minimum seconds between streamed UI updates; faster updates are merged
+STREAM_COALESCE_INTERVAL = 0.04
+
+# The shared agent runs one request at a time, so Gradio's queue does the
+# waiting (and shows users their position); QUEUE_MAX_SIZE bounds that queue
+AGENT_CONCURRENCY_LIMIT = 1
+QUEUE_MAX_SIZE = 32
+
+# Seconds to wait for agent cleanup and the loop thread at shutdown
+SHUTDOWN_TIMEOUT = 30
+
+# Marks the end of a streamed response on the bridge queue
+_SENTINEL = object()
+
+
+@functools.lru_cache(maxsize=4)
+def _lang_updates(lang: str, model: str, workspace: str) -> Tuple[Dict[str, str], ...]:
+    """Component update arguments for a language, in change_language output order"""
+    texts = RENDERED_STATIC[lang]
+    return (
+        {"value": texts["header_md"]},
+        {"label": texts["config_title"]},
+        {"value": TRANSLATIONS[lang]["config_content"].format(model=model, workspace=workspace)},
+        {"label": texts["chat_label"]},
+        {"label": texts["input_label"], "placeholder": texts["input_placeholder"]},
+        {"value": texts["send_button"]},
+        {"value": texts["clear_button"]},
+        {"label": texts["examples_label"]},
+        {"value": texts["footer"]},
+        *({"value": example[0]} for example in texts["examples"]),
+    )
+
+
 class WebUI:
-    """WebUI controller for OpenManus"""
+    """WebUI controller for OpenManus
+
+    Holds only what all sessions share: the agent, the event loop it runs on
+    and the default language. Chat history and language live in per-session
+    gr.State.
+    """
 
-    def __init__(self, language="ja"):
+    def __init__(self, loop: asyncio.AbstractEventLoop, language="ja"):
         self.agent = None
-        self.chat_history: List[Tuple[str, str]] = []
-        self.is_processing = False
+        # Persistent loop, running in a background thread, that owns the agent
+        self.loop = loop
+        # Gradio's queue already admits one agent run at a time; this lock also
+        # holds back a new run while a cancelled one is still cleaning up
+        self._lock = asyncio.Lock()
         self.language = language
 
-    def get_text(self, key: str, **kwargs) -> str:
-        """Get translated text for the current language"""
-        text = TRANSLATIONS[self.language].get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
+    def get_text(self, key: str, language: Optional[str] = None, **kwargs) -> str:
+        """Get translated text for the given language, or the default one"""
+        language = language or self.language
+        texts = TRANSLATIONS[language]
+        try:
+            text = texts[key]
+        except KeyError:
+            return key
+        return text.format(**kwargs) if kwargs else text
 
     async def initialize_agent(self):
-        """Initialize the Manus agent"""
+        """Initialize the Manus agent
+
+        MCP servers are not connected here: Manus.think() connects them inside
+        the request task, and the run's cleanup disconnects them from that same
+        task, as anyio transports require.
+        """
         if self.agent is None:
             logger.info("Initializing Manus agent...")
-            self.agent = await Manus.create()
+            self.agent = Manus()
             logger.info("Manus agent initialized successfully")
 
-    async def process_message(self, message: str, history: List[Tuple[str, str]]):
-        """Process user message and return response"""
+    async def process_message(
+        self,
+        message: str,
+        history: List[Dict[str, str]],
+        language: Optional[str] = None,
+    ):
+        """Process user message and return response
+
+        ``language`` comes from the calling session's state.
+        """
         if not message.strip():
             yield history, ""
             return
 
-        if self.is_processing:
-            yield history + [(message, self.get_text("already_processing"))], ""
-            return
-
-        try:
-            self.is_processing = True
-
-            # Initialize agent if not already done
-            await self.initialize_agent()
-
-            # Add user message to history
-            history.append((message, self.get_text("processing")))
-            yield history, ""
-
-            # Process the request
-            logger.info(f"Processing request: {message}")
-            result = await self.agent.run(message)
-
-            # Update the last message with the result
-            if result:
-                response = self.get_text("completed", result=result)
-            else:
-                response = self.get_text("completed_simple")
-
-            history[-1] = (message, response)
-
-        except Exception as e:
-            error_msg = self.get_text("error", error=str(e))
-            logger.error(f"Error processing message: {e}")
-            if history and history[-1][0] == message:
-                history[-1] = (message, error_msg)
-            else:
-                history.append((message, error_msg))
+        # Add user message to history
+        history.append({"role": "user", "content": message})
+        history.append({"role": "assistant", "content": self.get_text("processing", language)})
+        yield history, ""
 
-        finally:
-            self.is_processing = False
+        async with self._lock:
+            try:
+                # Initialize agent if not already done
+                await self.initialize_agent()
+
+                # Process the request, streaming each step into the last message
+                logger.info(f"Processing request: {message}")
+                steps: List[str] = []
+                last_emit = time.monotonic()
+                async for step_result in self.agent.run_stream(message):
+                    steps.append(step_result)
+                    # Coalesce bursts so Gradio is not flooded with frames
+                    now = time.monotonic()
+                    if now - last_emit < STREAM_COALESCE_INTERVAL:
+                        continue
+                    last_emit = now
+                    partial = "\n".join(steps)
+                    history[-1]["content"] = f"{self.get_text('processing', language)}\n\n{partial}"
+                    yield history, ""
+                result = "\n".join(steps)
+
+                # Update the last message with the result
+                if result:
+                    response = self.get_text("completed", language, result=result)
+                else:
+                    response = self.get_text("completed_simple", language)
+
+                history[-1]["content"] = response
+
+            except Exception as e:
+                error_msg = self.get_text("error", language, error=str(e))
+                logger.error(f"Error processing message: {e}")
+                history[-1]["content"] = error_msg
 
         yield history, ""
 
@@ -193,6 +278,11 @@ class WebUI:
 
 def create_gradio_interface(webui: WebUI):
     """Create and configure the Gradio interface"""
+    texts = RENDERED_STATIC[webui.language]
+    # Config is loaded once per process, so resolve the displayed values once
+    default_llm = config.llm.get("default")
+    model_name = default_llm.model if default_llm else "Not configured"
+    workspace_str = str(config.workspace_root)
 
     with gr.Blocks(
         title="OpenManus - AI Agent System",
@@ -208,107 +298,117 @@ def create_gradio_interface(webui: WebUI):
         with gr.Row():
             language_selector = gr.Radio(
                 choices=[("日本語", "ja"), ("English", "en")],
-                value="ja",
-                label=webui.get_text("language_label"),
+                value=webui.language,
+                label=texts["language_label"],
                 interactive=True
             )
 
         # Header
-        header_md = gr.Markdown(webui.get_text("description"))
-        title_md = gr.Markdown(f"# {webui.get_text('title')}")
+        header_md = gr.Markdown(texts["header_md"])
 
         # Configuration info
-        with gr.Accordion(webui.get_text("config_title"), open=False) as config_accordion:
-            model_name = config.llm.get('default').model if config.llm.get('default') else 'Not configured'
+        with gr.Accordion(texts["config_title"], open=False) as config_accordion:
             config_md = gr.Markdown(
-                webui.get_text("config_content", model=model_name, workspace=str(config.workspace_root))
+                webui.get_text("config_content", model=model_name, workspace=workspace_str)
             )
 
         # Chat interface
         with gr.Row():
             with gr.Column(scale=1):
                 chatbot = gr.Chatbot(
-                    label=webui.get_text("chat_label"),
+                    label=texts["chat_label"],
                     height=500,
                     show_copy_button=True,
                     avatar_images=(None, "assets/logo.jpg"),
-                    type="tuples"
+                    type="messages"
                 )
 
                 with gr.Row():
                     msg = gr.Textbox(
-                        label=webui.get_text("input_label"),
-                        placeholder=webui.get_text("input_placeholder"),
+                        label=texts["input_label"],
+                        placeholder=texts["input_placeholder"],
                         lines=3,
                         scale=4
                     )
-                    submit_btn = gr.Button(webui.get_text("send_button"), variant="primary", scale=1)
+                    submit_btn = gr.Button(texts["send_button"], variant="primary", scale=1)
 
                 with gr.Row():
-                    clear_btn = gr.Button(webui.get_text("clear_button"), size="sm")
+                    clear_btn = gr.Button(texts["clear_button"], size="sm")
 
-        # Examples
-        examples_label = gr.Markdown(f"### {webui.get_text('examples_label')}")
-        examples_component = gr.Examples(
-            examples=webui.get_text("examples"),
-            inputs=msg
-        )
+        # Examples: collapsed buttons that copy their prompt into the input
+        with gr.Accordion(texts["examples_label"], open=False) as examples_accordion:
+            example_btns = [
+                gr.Button(example[0], size="sm") for example in texts["examples"]
+            ]
+        for example_btn in example_btns:
+            example_btn.click(lambda prompt: prompt, inputs=example_btn, outputs=msg, queue=False)
 
         # Footer
-        footer_md = gr.Markdown(webui.get_text("footer"))
+        footer_md = gr.Markdown(texts["footer"])
+
+        # Per-session state: selected language
+        lang_state = gr.State(webui.language)
 
         # Language change handler
         def change_language(lang):
-            webui.language = lang
-            model_name = config.llm.get('default').model if config.llm.get('default') else 'Not configured'
-            return [
-                gr.update(value=f"# {webui.get_text('title')}"),
-                gr.update(value=webui.get_text("description")),
-                gr.update(label=webui.get_text("config_title")),
-                gr.update(value=webui.get_text("config_content", model=model_name, workspace=str(config.workspace_root))),
-                gr.update(label=webui.get_text("chat_label")),
-                gr.update(label=webui.get_text("input_label"), placeholder=webui.get_text("input_placeholder")),
-                gr.update(value=webui.get_text("send_button")),
-                gr.update(value=webui.get_text("clear_button")),
-                gr.update(value=f"### {webui.get_text('examples_label')}"),
-                gr.update(value=webui.get_text("footer"))
-            ]
+            # Gradio may consume update dicts, so build fresh ones from the cache
+            updates = [gr.update(**kwargs) for kwargs in _lang_updates(lang, model_name, workspace_str)]
+            return updates + [lang]
 
         language_selector.change(
             change_language,
             inputs=[language_selector],
-            outputs=[title_md, header_md, config_accordion, config_md, chatbot, msg, submit_btn, clear_btn, examples_label, footer_md]
+            outputs=[header_md, config_accordion, config_md, chatbot, msg, submit_btn, clear_btn, examples_accordion, footer_md, *example_btns, lang_state]
         )
 
         # Event handlers
-        def respond(message, chat_history):
-            """Wrapper for async message processing"""
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        loop = webui.loop
+
+        def respond(message, chat_history, lang):
+            """Stream async message processing into Gradio's sync generator"""
+            # Blank input needs no round trip through the event loop
+            if not message or not message.strip():
+                yield chat_history, ""
+                return
+
+            updates = queue.Queue()
+
+            async def pump():
+                try:
+                    async for history, text in webui.process_message(message, chat_history, lang):
+                        # Queue a snapshot: the loop keeps editing the pending
+                        # reply while Gradio serializes earlier frames
+                        snapshot = [*history[:-1], dict(history[-1])] if history else []
+                        updates.put((snapshot, text))
+                finally:
+                    updates.put(_SENTINEL)
+
+            future = asyncio.run_coroutine_threadsafe(pump(), loop)
             try:
-                async_gen = webui.process_message(message, chat_history)
-                for result in loop.run_until_complete(async_to_sync_generator(async_gen)):
-                    yield result
+                while True:
+                    item = updates.get()
+                    if item is _SENTINEL:
+                        break
+                    yield item
+                future.result()
             finally:
-                loop.close()
-
-        async def async_to_sync_generator(async_gen):
-            """Convert async generator to list for sync iteration"""
-            results = []
-            async for item in async_gen:
-                results.append(item)
-            return results
+                # Stop the agent run if Gradio closes the stream early
+                future.cancel()
 
         msg.submit(
             respond,
-            inputs=[msg, chatbot],
-            outputs=[chatbot, msg]
+            inputs=[msg, chatbot, lang_state],
+            outputs=[chatbot, msg],
+            concurrency_limit=AGENT_CONCURRENCY_LIMIT,
+            concurrency_id="agent"
         )
 
         submit_btn.click(
             respond,
-            inputs=[msg, chatbot],
-            outputs=[chatbot, msg]
+            inputs=[msg, chatbot, lang_state],
+            outputs=[chatbot, msg],
+            concurrency_limit=AGENT_CONCURRENCY_LIMIT,
+            concurrency_id="agent"
         )
 
         clear_btn.click(
@@ -348,8 +448,22 @@ def main():
     )
     args = parser.parse_args()
 
+    # One persistent event loop serves every request and the final cleanup
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+
     # Create WebUI instance with specified language
-    webui = WebUI(language=args.lang)
+    webui = WebUI(loop, language=args.lang)
+
+    # Build the agent in the background so the first request skips construction
+    def log_warmup_failure(future):
+        if not future.cancelled() and future.exception():
+            logger.error(f"Error initializing agent at startup: {future.exception()}")
+
+    asyncio.run_coroutine_threadsafe(
+        webui.initialize_agent(), loop
+    ).add_done_callback(log_warmup_failure)
 
     # Create and launch Gradio interface
     demo = create_gradio_interface(webui)
@@ -357,6 +471,7 @@ def main():
     logger.info(f"Starting OpenManus Web UI on http://{args.host}:{args.port}")
 
     try:
+        demo.queue(max_size=QUEUE_MAX_SIZE)
         demo.launch(
             server_name=args.host,
             server_port=args.port,
@@ -366,11 +481,19 @@ def main():
     except KeyboardInterrupt:
         logger.info("Shutting down Web UI...")
     finally:
-        # Cleanup
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(webui.cleanup())
-        loop.close()
+        # Cleanup on the loop that owns the agent, then stop and close it
+        cleanup = asyncio.run_coroutine_threadsafe(webui.cleanup(), loop)
+        try:
+            cleanup.result(timeout=SHUTDOWN_TIMEOUT)
+        except TimeoutError:
+            logger.warning(f"Agent cleanup did not finish within {SHUTDOWN_TIMEOUT}s")
+            cleanup.cancel()
+        except Exception as e:
+            logger.error(f"Error cleaning up agent: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(timeout=SHUTDOWN_TIMEOUT)
+        if not loop_thread.is_alive():
+            loop.close()
 
 
 if __name__ == "__main__":